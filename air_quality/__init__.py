@@ -0,0 +1,16 @@
+"""Data loading and forecasting for the Air Quality Trend and Forecasting System."""
+from air_quality.data import (
+    CITY,
+    NO2,
+    PM10,
+    PM25,
+    POLLUTANTS,
+    VERSION,
+    YEAR,
+    load_dataset,
+)
+from air_quality.forecast import TrendTable, load_trends
+from air_quality.health import classify, classify_all
+from air_quality.models import ModelStore, ModelTable, load_table
+from air_quality.sources import SOURCES, city_aqi, load_source, source_index
+from air_quality.yearly import YearlyIndex, load_index
@@ -0,0 +1,3 @@
+from air_quality.cli import main
+
+main()
@@ -0,0 +1,182 @@
+"""Plotly figures for the app, cached per data version.
+
+Figures are built from the yearly means in :class:`air_quality.yearly.YearlyIndex`
+and cached on the index's ``version``, so reruns reuse them until the data
+changes. Forecast overlays change with every slider move, so they are added
+to a copy of the cached figure rather than cached themselves. Series longer than ``MAX_POINTS`` are downsampled with
+Largest-Triangle-Three-Buckets before plotting. ``FIGURES.stats`` records
+cache hits, misses and build time, and :func:`figure_bytes` gives the size
+of the JSON sent to the browser.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+MAX_POINTS = 500
+
+
+def lttb(x, y, threshold):
+    """Indices of ``threshold`` points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Series already at or below
+    ``threshold`` points are returned whole.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+
+    edges = np.linspace(1, size - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, size - 1
+    previous = 0
+
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        following = slice(stop, edges[bucket + 2] if bucket + 2 < len(edges) else size)
+        next_x, next_y = x[following].mean(), y[following].mean()
+
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def downsample(frame, x, y, max_points=MAX_POINTS):
+    """Rows of ``frame`` kept by :func:`lttb` on columns ``x`` and ``y``."""
+    frame = frame.dropna(subset=[y])
+    if len(frame) <= max_points:
+        return frame
+    return frame.iloc[lttb(frame[x], frame[y], max_points)]
+
+
+class FigureCache:
+    """Bounded LRU cache of built figure dicts or tables with hit, miss and timing counts.
+
+    Keys start with the data version; a version of None disables caching.
+    Streamlit runs sessions on separate threads, so lookups and inserts hold
+    a lock. Builds run outside it; two threads missing the same key both
+    build, and the last one is kept.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "build_seconds": 0.0}
+        self.lock = threading.Lock()
+
+    def get(self, key, build):
+        if key[0] is not None:
+            with self.lock:
+                value = self.entries.get(key)
+                if value is not None:
+                    self.entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return value
+
+        start = time.perf_counter()
+        value = build()
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            self.stats["build_seconds"] += elapsed
+            self.stats["misses"] += 1
+            if key[0] is not None:
+                self.entries[key] = value
+                if len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+        return value
+
+
+FIGURES = FigureCache()
+TABLES = FigureCache(maxsize=8)
+
+
+def figure_bytes(figure):
+    """Size in bytes of the figure JSON sent to the browser."""
+    return len(figure.to_json().encode())
+
+
+def city_figure(index, city, pollutant, forecast=None, trend=None, max_points=MAX_POINTS):
+    """Line chart of one city's yearly means.
+
+    ``forecast`` is an optional ``(year, value)`` pair, drawn as a marker.
+    ``trend`` is a table with a ``trend(city, pollutant, years)`` method,
+    such as :class:`air_quality.forecast.TrendTable`; its fitted line from
+    the first plotted year through to the forecast year is overlaid as a
+    dashed line. The chart of the observed data is cached per data version
+    and the overlay is added to a copy.
+    """
+    key = (index.version, "city", city, pollutant, max_points)
+    cached, span = FIGURES.get(key, lambda: _city_figure(index, city, pollutant, max_points))
+    # The cached dict was produced by a validated figure, so skip validating
+    # it again; that takes most of the time of copying a figure.
+    figure = go.Figure(cached, _validate=False)
+    if forecast is None:
+        return figure
+
+    forecast_year, value = forecast
+    if trend is not None and span is not None:
+        first, last = span
+        years = np.append(np.arange(first, max(last, forecast_year)), forecast_year)
+        figure.add_trace(go.Scatter(
+            x=years,
+            y=trend.trend(city, pollutant, years),
+            mode="lines",
+            line={"dash": "dash"},
+            name="Trend",
+        ))
+    figure.add_trace(go.Scatter(x=[forecast_year], y=[value], mode="markers", marker={"size": 8}, name="Forecast"))
+    figure.update_layout(showlegend=True)
+    return figure
+
+
+def _city_figure(index, city, pollutant, max_points):
+    yearly = index.yearly(city, pollutant)
+    year = yearly.columns[0]
+    points = downsample(yearly, year, pollutant, max_points)
+
+    figure = go.Figure(go.Scatter(x=points[year], y=points[pollutant], mode="lines", name=city))
+    figure.update_layout(
+        title=f"{pollutant} Levels in {city}",
+        xaxis_title=year,
+        yaxis_title=pollutant,
+        showlegend=False,
+    )
+    span = (int(points[year].iloc[0]), int(points[year].iloc[-1])) if len(points) else None
+    return figure.to_dict(), span
+
+
+def wide_means(index, pollutant):
+    """Yearly means for every city as a year-by-city table, cached per version."""
+    key = (index.version, pollutant)
+    return TABLES.get(key, lambda: index.means[pollutant].unstack(level=0))
+
+
+def compare_figure(index, cities, pollutant, max_points=MAX_POINTS):
+    """One line per city, drawn from the shared year-by-city table."""
+    key = (index.version, "compare", tuple(cities), pollutant, max_points)
+    cached = FIGURES.get(key, lambda: _compare_figure(index, cities, pollutant, max_points).to_dict())
+    # Every session shares the cached dict, so each caller gets its own figure.
+    return go.Figure(cached, _validate=False)
+
+
+def _compare_figure(index, cities, pollutant, max_points):
+    table = wide_means(index, pollutant)
+    year = table.index.name
+    figure = go.Figure()
+    for city in cities:
+        series = pd.DataFrame({year: table.index, pollutant: table[city].to_numpy()})
+        points = downsample(series, year, pollutant, max_points)
+        figure.add_trace(go.Scatter(x=points[year], y=points[pollutant], mode="lines+markers", name=city))
+    figure.update_layout(title=f"{pollutant} Levels by City", xaxis_title=year, yaxis_title=pollutant)
+    return figure
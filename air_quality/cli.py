@@ -0,0 +1,135 @@
+"""Command-line batch forecasts.
+
+Writes the forecast and health band for every city, pollutant and horizon to
+CSV or Parquet without importing streamlit or plotly:
+
+    python -m air_quality forecasts.csv
+    python -m air_quality forecasts.parquet --max-years-ahead 10 --workers 3
+    python -m air_quality forecasts.csv --model huber
+
+With ``--model`` the forecasts come from a saved measurement-year model table
+(see :mod:`air_quality.models`), trained first if missing. Horizons then
+count from each city's latest measurement year, and the output gains ``low``
+and ``high`` columns for the 95% prediction interval.
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from air_quality.data import CHUNKSIZE, CITY, DATA_PATH, POLLUTANTS
+from air_quality.forecast import MAX_YEARS_AHEAD, load_trends
+from air_quality.health import classify_all
+from air_quality.models import METHODS, MODELS_DIR, load_table
+
+COLUMNS = [CITY, "pollutant", "years_ahead", "year", "predicted", "band"]
+MODEL_COLUMNS = COLUMNS + ["low", "high"]
+
+
+def forecast_pollutant(path, pollutant, max_years_ahead, chunksize=None, model=None, models_dir=MODELS_DIR):
+    """Forecasts for one pollutant at every horizon from 0 to ``max_years_ahead``.
+
+    ``model`` names a method from :data:`air_quality.models.METHODS` whose
+    saved table is used instead of the linear trend over database versions.
+    """
+    if model:
+        forecasts = load_table(path, model, chunksize, models_dir)
+    else:
+        forecasts = load_trends(path, chunksize=chunksize)
+    frames = []
+    for years_ahead in range(max_years_ahead + 1):
+        frame = forecasts.forecast_ahead(pollutant, years_ahead)
+        frame.insert(1, "pollutant", pollutant)
+        frame.insert(2, "years_ahead", years_ahead)
+        frame["band"] = classify_all(pollutant, frame["predicted"])
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)[MODEL_COLUMNS if model else COLUMNS]
+
+
+class CsvWriter:
+    def __init__(self, path, columns=COLUMNS):
+        self.path = path
+        self.columns = columns
+        self.header = True
+
+    def write(self, frame):
+        frame.to_csv(self.path, mode="w" if self.header else "a", header=self.header, index=False)
+        self.header = False
+
+    def close(self):
+        if self.header:
+            pd.DataFrame(columns=self.columns).to_csv(self.path, index=False)
+
+
+class ParquetWriter:
+    def __init__(self, path):
+        import pyarrow.parquet
+
+        self.path = path
+        self.parquet = pyarrow.parquet
+        self.writer = None
+
+    def write(self, frame):
+        import pyarrow
+
+        table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+        if self.writer is None:
+            self.writer = self.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_writer(path, columns=COLUMNS):
+    if path.endswith(".parquet"):
+        try:
+            return ParquetWriter(path)
+        except ImportError:
+            sys.exit("Writing Parquet requires pyarrow; install it or write to a .csv file.")
+    return CsvWriter(path, columns)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python -m air_quality", description="Export air quality forecasts for every city.")
+    parser.add_argument("output", help="output file; .parquet writes Parquet, anything else CSV")
+    parser.add_argument("--data", default=DATA_PATH, help="WHO air quality CSV (default: %(default)s)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="stream the CSV in chunks of this many rows")
+    parser.add_argument("--pollutant", action="append", choices=POLLUTANTS, help="pollutant to export; repeatable (default: all)")
+    parser.add_argument("--max-years-ahead", type=int, default=MAX_YEARS_AHEAD, help="largest horizon in years (default: %(default)s)")
+    parser.add_argument("--model", choices=METHODS, help="use a saved measurement-year model and add prediction intervals")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="directory for model files (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=min(len(POLLUTANTS), os.cpu_count() or 1), help="worker processes (default: %(default)s)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    path = os.path.abspath(args.data)
+    pollutants = args.pollutant or POLLUTANTS
+    writer = open_writer(args.output, MODEL_COLUMNS if args.model else COLUMNS)
+    rows = 0
+    if args.model:
+        # Train once up front rather than in every worker.
+        load_table(path, args.model, args.chunksize, args.models_dir)
+
+    try:
+        if args.workers > 1:
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                jobs = [executor.submit(forecast_pollutant, path, pollutant, args.max_years_ahead, args.chunksize, args.model, args.models_dir) for pollutant in pollutants]
+                for job in jobs:
+                    frame = job.result()
+                    writer.write(frame)
+                    rows += len(frame)
+        else:
+            for pollutant in pollutants:
+                frame = forecast_pollutant(path, pollutant, args.max_years_ahead, args.chunksize, args.model, args.models_dir)
+                writer.write(frame)
+                rows += len(frame)
+    finally:
+        writer.close()
+
+    print(f"Wrote {rows} forecasts to {args.output}")
@@ -0,0 +1,157 @@
+"""Loading the WHO Global Air Quality Database.
+
+The CSV is parsed once per process with explicit dtypes and kept in a
+process-wide cache keyed by the file's mtime and size, so Streamlit reruns
+reuse the same frame instead of re-reading the file. A Parquet sidecar can
+optionally be written next to the CSV so cold starts skip CSV parsing; it
+records the mtime and size of the CSV it was built from and is rebuilt when
+they no longer match.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "data")
+
+# Larger WHO releases can be used by pointing AIR_QUALITY_DATA at them, and
+# streamed in chunks of AIR_QUALITY_CHUNKSIZE rows instead of loaded whole.
+DATA_PATH = os.environ.get("AIR_QUALITY_DATA", os.path.join(DATA_DIR, "air_quality.csv"))
+CHUNKSIZE = int(os.environ.get("AIR_QUALITY_CHUNKSIZE", 0)) or None
+
+REGION = "WHO Region"
+ISO3 = "ISO3"
+COUNTRY = "WHO Country Name"
+CITY = "City or Locality"
+YEAR = "Measurement Year"
+VERSION = "Version of the database"
+
+PM25 = "PM2.5 (μg/m3)"
+PM10 = "PM10 (μg/m3)"
+NO2 = "NO2 (μg/m3)"
+POLLUTANTS = [PM25, PM10, NO2]
+
+# Parquet schema metadata entry holding the file_key of the source file.
+SOURCE_KEY = b"air_quality.source_key"
+
+DTYPES = {
+    REGION: "category",
+    ISO3: "category",
+    COUNTRY: "category",
+    CITY: "category",
+    YEAR: "int16",
+    VERSION: "int16",
+    PM25: "float32",
+    PM10: "float32",
+    NO2: "float32",
+    "PM25 temporal coverage (%)": "float32",
+    "PM10 temporal coverage (%)": "float32",
+    "NO2 temporal coverage (%)": "float32",
+}
+
+
+def file_key(path):
+    """Return the (mtime_ns, size) pair used to detect changes to a file."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(path):
+    """SHA-1 of the file's contents, recomputed only when its file key changes.
+
+    Unlike :func:`file_key` this is the same for identical copies of a file,
+    wherever they are and whatever their mtime.
+    """
+    path = os.path.abspath(path)
+    return _file_hash(path, file_key(path))
+
+
+@lru_cache(maxsize=4)
+def _file_hash(path, key):
+    digest = hashlib.sha1()
+    with open(path, "rb") as data:
+        for block in iter(lambda: data.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def sidecar_path(path):
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def load_dataset(path=DATA_PATH, sidecar=False):
+    """Return the WHO dataset as a typed DataFrame.
+
+    The result is cached for the life of the process and shared between
+    callers, so it must not be modified in place. Editing the file on disk
+    invalidates the cache. With ``sidecar=True`` a Parquet copy is read or
+    written next to the CSV when pyarrow is available.
+    """
+    path = os.path.abspath(path)
+    return _load_dataset(path, file_key(path), sidecar)
+
+
+@lru_cache(maxsize=4)
+def _load_dataset(path, key, sidecar):
+    if sidecar:
+        df = _read_sidecar(path, key)
+        if df is not None:
+            return df
+
+    df = pd.read_csv(path, dtype=DTYPES)
+
+    if sidecar:
+        _write_sidecar(path, key, df)
+    return df
+
+
+def _read_sidecar(path, key):
+    return read_parquet_cache(sidecar_path(path), key)
+
+
+def _write_sidecar(path, key, df):
+    write_parquet_cache(sidecar_path(path), key, df)
+
+
+def read_parquet_cache(parquet, key):
+    """Read a Parquet copy written by :func:`write_parquet_cache` for ``key``.
+
+    Returns None when the file is missing, unreadable or was built from a
+    different version of the source file, whether newer or older.
+    """
+    try:
+        import pyarrow.parquet
+
+        metadata = pyarrow.parquet.read_schema(parquet).metadata or {}
+        if metadata.get(SOURCE_KEY) != repr(key).encode():
+            return None
+        return pd.read_parquet(parquet)
+    except (OSError, ImportError, ValueError):
+        return None
+
+
+def write_parquet_cache(parquet, key, df):
+    """Write ``df`` to ``parquet``, tagged with the ``file_key`` of its source."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+
+        table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), SOURCE_KEY: repr(key).encode()})
+    except ImportError:
+        # Installs without pyarrow just skip the copy.
+        return
+
+    # Write to a temporary file first so other processes never read a partial file.
+    temporary = f"{parquet}.{os.getpid()}.tmp"
+    try:
+        pyarrow.parquet.write_table(table, temporary)
+        os.replace(temporary, parquet)
+    except OSError:
+        # Read-only deploys skip the copy; a full disk must not leave a partial file behind.
+        try:
+            os.remove(temporary)
+        except OSError:
+            pass
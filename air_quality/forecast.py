@@ -0,0 +1,136 @@
+"""Linear trends for every city and pollutant, fitted in one pass.
+
+Each series is the yearly means from :class:`air_quality.yearly.YearlyIndex`.
+Ordinary least squares has a closed form in terms of per-series sums
+(n, sum x, sum y, sum xy, sum x^2), so all series are fitted together with
+``np.bincount`` instead of one ``LinearRegression`` per city. Coefficients are
+stored in arrays with one row per city and one column per pollutant.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from air_quality.data import CHUNKSIZE, DATA_PATH, file_key
+from air_quality.yearly import load_index
+
+# Years are centred before summing to keep the sums well conditioned.
+YEAR_ORIGIN = 2000
+
+# Database versions trail the measurements they contain, so forecasts are
+# reported this many years after the latest version year.
+VERSION_OFFSET = 4
+
+MAX_YEARS_AHEAD = 24
+
+
+class TrendTable:
+    """Slope and intercept of the yearly trend for each (city, pollutant).
+
+    ``slope`` and ``intercept`` are ``(cities, pollutants)`` arrays in units
+    per year, with the intercept at ``YEAR_ORIGIN``. Series with fewer than
+    two distinct years are NaN. ``last_year`` holds the latest year with
+    data for each series.
+    """
+
+    def __init__(self, cities, pollutants, slope, intercept, last_year, points):
+        self.cities = cities
+        self.pollutants = list(pollutants)
+        self.slope = slope
+        self.intercept = intercept
+        self.last_year = last_year
+        self.points = points
+        self.row = {city: i for i, city in enumerate(cities)}
+        self.column = {pollutant: j for j, pollutant in enumerate(self.pollutants)}
+
+    @classmethod
+    def from_means(cls, means):
+        """Fit every series in ``means``, indexed by (city, year)."""
+        codes, cities = pd.factorize(means.index.get_level_values(0))
+        years = means.index.get_level_values(1).to_numpy(dtype="float64")
+        size = len(cities)
+        shape = (size, means.shape[1])
+
+        slope = np.full(shape, np.nan)
+        intercept = np.full(shape, np.nan)
+        last_year = np.full(shape, np.nan)
+        points = np.zeros(shape, dtype=np.int32)
+
+        for j, pollutant in enumerate(means.columns):
+            y = means[pollutant].to_numpy(dtype="float64")
+            valid = ~np.isnan(y)
+            c, x, y = codes[valid], years[valid] - YEAR_ORIGIN, y[valid]
+
+            n = np.bincount(c, minlength=size).astype("float64")
+            sx = np.bincount(c, weights=x, minlength=size)
+            sy = np.bincount(c, weights=y, minlength=size)
+            sxy = np.bincount(c, weights=x * y, minlength=size)
+            sxx = np.bincount(c, weights=x * x, minlength=size)
+
+            denominator = n * sxx - sx * sx
+            fitted = denominator > 0
+            b = (n[fitted] * sxy[fitted] - sx[fitted] * sy[fitted]) / denominator[fitted]
+            slope[fitted, j] = b
+            intercept[fitted, j] = (sy[fitted] - b * sx[fitted]) / n[fitted]
+
+            latest = np.full(size, -np.inf)
+            np.maximum.at(latest, c, x + YEAR_ORIGIN)
+            last_year[n > 0, j] = latest[n > 0]
+            points[:, j] = n
+
+        return cls(np.asarray(cities), means.columns, slope, intercept, last_year, points)
+
+    def predict(self, city, pollutant, year):
+        """Trend value for one city and pollutant in ``year``."""
+        i, j = self.row[city], self.column[pollutant]
+        return float(self.intercept[i, j] + self.slope[i, j] * (year - YEAR_ORIGIN))
+
+    def trend(self, city, pollutant, years):
+        """Trend values for one city in each of ``years``, clipped at zero."""
+        i, j = self.row[city], self.column[pollutant]
+        years = np.asarray(years, dtype="float64")
+        return np.maximum(self.intercept[i, j] + self.slope[i, j] * (years - YEAR_ORIGIN), 0.0)
+
+    def forecast_all(self, pollutant, year):
+        """Trend values in ``year`` for every city with a fitted trend."""
+        j = self.column[pollutant]
+        fitted = ~np.isnan(self.slope[:, j])
+        values = self.intercept[fitted, j] + self.slope[fitted, j] * (year - YEAR_ORIGIN)
+        return pd.Series(values, index=pd.Index(self.cities[fitted], name="City or Locality"), name=pollutant)
+
+    def forecast(self, city, pollutant, years_ahead):
+        """Return ``(year, value)`` for ``years_ahead`` years past the latest data.
+
+        Negative trend values are clipped to zero.
+        """
+        i, j = self.row[city], self.column[pollutant]
+        year = int(self.last_year[i, j]) + years_ahead + VERSION_OFFSET
+        return year, max(0.0, self.predict(city, pollutant, year))
+
+    def forecast_ahead(self, pollutant, years_ahead):
+        """Vectorized :meth:`forecast` for every city with a fitted trend.
+
+        Returns a DataFrame with ``City or Locality``, ``year`` and
+        ``predicted`` columns.
+        """
+        j = self.column[pollutant]
+        fitted = ~np.isnan(self.slope[:, j])
+        years = self.last_year[fitted, j] + years_ahead + VERSION_OFFSET
+        values = self.intercept[fitted, j] + self.slope[fitted, j] * (years - YEAR_ORIGIN)
+        return pd.DataFrame({
+            "City or Locality": self.cities[fitted],
+            "year": years.astype("int16"),
+            "predicted": np.maximum(values, 0.0),
+        })
+
+
+def load_trends(path=DATA_PATH, sidecar=False, chunksize=CHUNKSIZE):
+    """Return the trend table for the dataset at ``path``, cached per process."""
+    path = os.path.abspath(path)
+    return _load_trends(path, file_key(path), sidecar, chunksize)
+
+
+@lru_cache(maxsize=4)
+def _load_trends(path, key, sidecar, chunksize):
+    return TrendTable.from_means(load_index(path, sidecar=sidecar, chunksize=chunksize).means)
@@ -0,0 +1,103 @@
+"""Health-impact bands for predicted pollutant levels.
+
+Each pollutant has an ordered table of bands around its WHO annual guideline
+value. A value exactly on the guideline is "stable", below it "healthy", and
+the bands above it grade the health risk. The text and images shown for
+each band come from :mod:`air_quality.content`.
+"""
+import io
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from air_quality import content
+from air_quality.data import DATA_DIR, NO2, PM10, PM25
+
+INF = float("inf")
+
+# Images are shown at this width, and streamlit downscales anything wider on
+# every new media file, so they are resized to it up front.
+IMAGE_WIDTH = 300
+
+# (band, lower, upper, closed) with ``closed`` as in pandas.Interval.
+BANDS = {
+    PM25: [
+        ("healthy", -INF, 5, "neither"),
+        ("stable", 5, 5, "both"),
+        ("elevated", 5, 10, "neither"),
+        ("high", 10, 15, "left"),
+        ("very high", 15, INF, "left"),
+    ],
+    PM10: [
+        ("healthy", -INF, 15, "neither"),
+        ("stable", 15, 15, "both"),
+        ("high", 15, INF, "neither"),
+    ],
+    NO2: [
+        ("healthy", -INF, 10, "neither"),
+        ("stable", 10, 10, "both"),
+        ("elevated", 10, 40, "right"),
+        ("high", 40, INF, "neither"),
+    ],
+}
+
+
+def _contains(lower, upper, closed, values):
+    above = values >= lower if closed in ("left", "both") else values > lower
+    below = values <= upper if closed in ("right", "both") else values < upper
+    return above & below
+
+
+def classify(pollutant, value):
+    """Return the band name for a single predicted ``value``, or None."""
+    for band, lower, upper, closed in BANDS[pollutant]:
+        if _contains(lower, upper, closed, value):
+            return band
+    return None
+
+
+def classify_all(pollutant, values):
+    """Vectorized :func:`classify`; NaN values get None."""
+    values = np.asarray(values, dtype="float64")
+    result = np.full(values.shape, None, dtype=object)
+    for band, lower, upper, closed in BANDS[pollutant]:
+        result[_contains(lower, upper, closed, values)] = band
+    return result
+
+
+def summary(pollutant, band, city):
+    """The bold summary line for a band, followed by any band-specific notes."""
+    return [content.SUMMARIES[pollutant][band].format(city=city)] + content.NOTES.get((pollutant, band), [])
+
+
+def sections(pollutant, band):
+    """Expander sections for a band as (title, paragraphs, figure) tuples.
+
+    Bands at or below the guideline have no sections.
+    """
+    if band in ("healthy", "stable"):
+        return []
+    result = []
+    for title, paragraphs, figure in content.SECTIONS[pollutant]:
+        if figure is not None:
+            image, caption, text = figure
+            figure = (image, content.CAPTIONS.get((pollutant, band), caption), text)
+        result.append((title, paragraphs, figure))
+    return result
+
+
+@lru_cache(maxsize=None)
+def image_bytes(name, width=IMAGE_WIDTH):
+    """JPEG bytes for a content image, resized to at most ``width`` pixels.
+
+    Images are decoded and resized once per process.
+    """
+    from PIL import Image
+
+    with Image.open(os.path.join(DATA_DIR, content.IMAGES[name])) as image:
+        image = image.convert("RGB")
+        image.thumbnail((width, width * image.height // image.width))
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=85, optimize=True)
+    return buffer.getvalue()
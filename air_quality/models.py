@@ -0,0 +1,326 @@
+"""Per-city forecasting models on measurement years, trained off the request path.
+
+Every (city, pollutant) series of yearly means by ``Measurement Year`` is
+fitted with one of ``METHODS`` in a single vectorized pass:
+
+- ``ols``: ordinary least squares.
+- ``ridge``: least squares with the slope shrunk by ``RIDGE_ALPHA``, which
+  damps the trend of short, noisy series.
+- ``huber``: Huber regression by iteratively reweighted least squares,
+  which limits the pull of outlying years.
+
+Each fit stores a 95% prediction interval alongside the trend. Fitted tables
+are saved to ``MODELS_DIR`` under a name derived from a hash of the data
+file's contents, so they survive restarts and deploys and can be produced
+ahead of time by another machine (``python -m air_quality.models``). :class:`ModelStore` trains missing
+tables in a background thread and reloads a table whenever its file changes,
+so requests only ever do array lookups.
+
+Forecasts count years from each series' latest measurement year, so unlike
+:class:`air_quality.forecast.TrendTable` they need no offset between
+database versions and the years they cover.
+"""
+import argparse
+import glob
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from air_quality.data import CHUNKSIZE, CITY, DATA_DIR, DATA_PATH, YEAR, file_hash
+from air_quality.yearly import load_index
+
+METHODS = ["ols", "ridge", "huber"]
+RIDGE_ALPHA = 1.0
+HUBER_K = 1.345
+HUBER_ITERATIONS = 20
+CONFIDENCE = 0.95
+
+MODELS_DIR = os.environ.get("AIR_QUALITY_MODELS", os.path.join(DATA_DIR, "models"))
+
+
+def _weighted_fit(codes, x, y, weights, size, alpha=0.0):
+    """Grouped weighted least squares on centred years."""
+    total = np.bincount(codes, weights=weights, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = np.bincount(codes, weights=weights * x, minlength=size) / total
+        y_mean = np.bincount(codes, weights=weights * y, minlength=size) / total
+    dx = x - x_mean[codes]
+    sxx = np.bincount(codes, weights=weights * dx * dx, minlength=size)
+    sxy = np.bincount(codes, weights=weights * dx * (y - y_mean[codes]), minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = sxy / (sxx + alpha)
+    return slope, x_mean, y_mean
+
+
+def _huber_weights(codes, residuals, size):
+    absolute = np.abs(residuals)
+    mad = pd.Series(absolute).groupby(codes).median().reindex(range(size)).to_numpy()
+    scale = 1.4826 * mad[codes] * HUBER_K
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weights = np.where(scale > 0, np.minimum(1.0, scale / absolute), 1.0)
+    return np.nan_to_num(weights, nan=1.0)
+
+
+class ModelTable:
+    """Fitted trend and prediction interval for each (city, pollutant).
+
+    Arrays are ``(cities, pollutants)``. The trend is
+    ``y_mean + slope * (year - x_mean)``; ``sxx``, ``points`` and ``sigma``
+    (residual standard deviation) give the interval width. Series with fewer
+    than two years are NaN, and intervals need at least three.
+    """
+
+    ARRAYS = ["slope", "x_mean", "y_mean", "sxx", "sigma", "points", "last_year"]
+
+    def __init__(self, method, cities, pollutants, **arrays):
+        self.method = method
+        self.cities = np.asarray(cities)
+        self.pollutants = list(pollutants)
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self.row = {city: i for i, city in enumerate(self.cities)}
+        self.column = {pollutant: j for j, pollutant in enumerate(self.pollutants)}
+
+    @classmethod
+    def fit(cls, means, method="ols"):
+        """Fit every series in ``means``, indexed by (city, year)."""
+        if method not in METHODS:
+            raise ValueError(f"unknown method {method!r}; expected one of {METHODS}")
+
+        codes, cities = pd.factorize(means.index.get_level_values(0))
+        years = means.index.get_level_values(1).to_numpy(dtype="float64")
+        size = len(cities)
+        arrays = {name: np.full((size, means.shape[1]), np.nan) for name in cls.ARRAYS}
+
+        for j, pollutant in enumerate(means.columns):
+            y = means[pollutant].to_numpy(dtype="float64")
+            valid = ~np.isnan(y)
+            c, x, y = codes[valid], years[valid], y[valid]
+            weights = np.ones_like(y)
+            alpha = RIDGE_ALPHA if method == "ridge" else 0.0
+
+            slope, x_mean, y_mean = _weighted_fit(c, x, y, weights, size, alpha)
+            if method == "huber":
+                for _ in range(HUBER_ITERATIONS):
+                    residuals = y - y_mean[c] - np.nan_to_num(slope)[c] * (x - x_mean[c])
+                    weights = _huber_weights(c, residuals, size)
+                    slope, x_mean, y_mean = _weighted_fit(c, x, y, weights, size, alpha)
+
+            # Store the trend relative to the unweighted mean year, which is
+            # where the prediction interval is narrowest.
+            n = np.bincount(c, minlength=size).astype("float64")
+            with np.errstate(invalid="ignore", divide="ignore"):
+                centre = np.bincount(c, weights=x, minlength=size) / n
+            level = y_mean + slope * (centre - x_mean)
+            dx = x - centre[c]
+            residuals = y - level[c] - slope[c] * dx
+            sse = np.bincount(c, weights=residuals * residuals, minlength=size)
+            sxx = np.bincount(c, weights=dx * dx, minlength=size)
+            latest = np.full(size, -np.inf)
+            np.maximum.at(latest, c, x)
+
+            fitted = sxx > 0
+            arrays["slope"][fitted, j] = slope[fitted]
+            arrays["x_mean"][fitted, j] = centre[fitted]
+            arrays["y_mean"][fitted, j] = level[fitted]
+            arrays["sxx"][fitted, j] = sxx[fitted]
+            arrays["points"][fitted, j] = n[fitted]
+            arrays["last_year"][fitted, j] = latest[fitted]
+            spread = fitted & (n > 2)
+            arrays["sigma"][spread, j] = np.sqrt(sse[spread] / (n[spread] - 2))
+
+        return cls(method, cities, means.columns, **arrays)
+
+    def _predict(self, i, j, year):
+        # scipy is slow to import and only needed once a forecast is made.
+        from scipy import stats
+
+        value = self.y_mean[i, j] + self.slope[i, j] * (year - self.x_mean[i, j])
+        n = self.points[i, j]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = stats.t.ppf(0.5 + CONFIDENCE / 2, n - 2)
+            half = t * self.sigma[i, j] * np.sqrt(1 + 1 / n + (year - self.x_mean[i, j]) ** 2 / self.sxx[i, j])
+        return np.maximum(value, 0.0), np.maximum(value - half, 0.0), np.maximum(value + half, 0.0)
+
+    def predict(self, city, pollutant, year):
+        """``(value, low, high)`` for one city in ``year``, clipped at zero.
+
+        ``low`` and ``high`` are NaN when the series has only two years.
+        """
+        value, low, high = self._predict(self.row[city], self.column[pollutant], year)
+        return float(value), float(low), float(high)
+
+    def trend(self, city, pollutant, years):
+        """Fitted values for one city in each of ``years``, clipped at zero."""
+        value, _, _ = self._predict(self.row[city], self.column[pollutant], np.asarray(years, dtype="float64"))
+        return value
+
+    def forecast(self, city, pollutant, years_ahead):
+        """``(year, value, low, high)`` for ``years_ahead`` years past the latest measurement.
+
+        Returns None when the city has no fitted model for ``pollutant``.
+        """
+        i = self.row.get(city)
+        j = self.column[pollutant]
+        if i is None or np.isnan(self.slope[i, j]):
+            return None
+        year = int(self.last_year[i, j]) + years_ahead
+        return (year,) + self.predict(city, pollutant, year)
+
+    def forecast_ahead(self, pollutant, years_ahead):
+        """Vectorized :meth:`forecast` for every city with a fitted model.
+
+        Returns a DataFrame with ``City or Locality``, ``year``,
+        ``predicted``, ``low`` and ``high`` columns.
+        """
+        j = self.column[pollutant]
+        fitted = np.flatnonzero(~np.isnan(self.slope[:, j]))
+        years = self.last_year[fitted, j] + years_ahead
+        value, low, high = self._predict(fitted, j, years)
+        return pd.DataFrame({
+            CITY: self.cities[fitted],
+            "year": years.astype("int16"),
+            "predicted": value,
+            "low": low,
+            "high": high,
+        })
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        temporary = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.{threading.get_ident()}.npz")
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        try:
+            np.savez_compressed(
+                temporary,
+                method=np.array(self.method),
+                cities=self.cities.astype(str),
+                pollutants=np.array(self.pollutants),
+                **arrays,
+            )
+            # Readers poll the file, so it appears all at once.
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as saved:
+            arrays = {name: saved[name] for name in cls.ARRAYS}
+            return cls(str(saved["method"]), saved["cities"], saved["pollutants"].tolist(), **arrays)
+
+
+def model_path(path, method, directory=MODELS_DIR):
+    """File for the ``method`` table fitted on the contents of the dataset at ``path``."""
+    return os.path.join(directory, f"{method}-{file_hash(path)[:16]}.npz")
+
+
+def train(path=DATA_PATH, method="ols", chunksize=CHUNKSIZE, directory=MODELS_DIR, sidecar=False):
+    """Fit and save the ``method`` table for the dataset at ``path``.
+
+    Tables for the same method fitted on other data are removed. ``sidecar``
+    is passed to :func:`air_quality.yearly.load_index`; use the caller's
+    value so the index is shared with it rather than built again.
+    """
+    index = load_index(path, sidecar=sidecar, chunksize=chunksize, year_column=YEAR)
+    destination = model_path(path, method, directory)
+    ModelTable.fit(index.means, method).save(destination)
+    for superseded in glob.glob(os.path.join(directory, f"{method}-*.npz")):
+        if superseded != destination:
+            try:
+                os.remove(superseded)
+            except OSError:
+                pass
+    return destination
+
+
+def load_table(path=DATA_PATH, method="ols", chunksize=CHUNKSIZE, directory=MODELS_DIR, sidecar=False):
+    """The saved ``method`` table for the dataset at ``path``, trained first if missing."""
+    destination = model_path(path, method, directory)
+    if not os.path.exists(destination):
+        destination = train(path, method, chunksize, directory, sidecar)
+    return ModelTable.load(destination)
+
+
+class ModelStore:
+    """Trained model tables for the app, trained and reloaded in the background.
+
+    :meth:`get` never fits a model on the calling thread. It returns the
+    saved table for the current data version, reloading it when the file
+    changes on disk, or schedules training and returns None until then.
+    If training fails, :meth:`error` returns the exception and no retry is
+    made until the data file changes; if a trained file later disappears, it
+    is trained again. Pass the same ``sidecar`` as the app's
+    :func:`air_quality.yearly.load_index` calls so training reuses its index.
+    """
+
+    def __init__(self, path=DATA_PATH, chunksize=CHUNKSIZE, directory=MODELS_DIR, workers=1, sidecar=False):
+        self.path = path
+        self.chunksize = chunksize
+        self.directory = directory
+        self.sidecar = sidecar
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="air-quality-models")
+        self.lock = threading.Lock()
+        self.tables = {}
+        self.jobs = {}
+
+    def get(self, method):
+        """The ``method`` table for the current data, or None while it trains."""
+        path = model_path(self.path, method, self.directory)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._schedule(path, method)
+            return None
+
+        with self.lock:
+            loaded = self.tables.get(path)
+            if loaded is not None and loaded[0] == mtime:
+                return loaded[1]
+        table = ModelTable.load(path)
+        with self.lock:
+            self.tables[path] = (mtime, table)
+        return table
+
+    def error(self, method):
+        """The exception raised by training ``method`` on the current data, if it failed."""
+        with self.lock:
+            job = self.jobs.get(model_path(self.path, method, self.directory))
+        if job is None or not job.done():
+            return None
+        return job.exception()
+
+    def _schedule(self, path, method):
+        with self.lock:
+            job = self.jobs.get(path)
+            # Failed jobs stay put so error() can report them; a job that
+            # succeeded but whose file has since been removed is run again.
+            if job is None or (job.done() and job.exception() is None):
+                self.jobs[path] = self.executor.submit(
+                    train, self.path, method, self.chunksize, self.directory, self.sidecar
+                )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m air_quality.models", description="Train and save forecasting models.")
+    parser.add_argument("--data", default=DATA_PATH, help="WHO air quality CSV (default: %(default)s)")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="stream the CSV in chunks of this many rows")
+    parser.add_argument("--method", action="append", choices=METHODS, help="method to train; repeatable (default: all)")
+    parser.add_argument("--output", default=MODELS_DIR, help="directory for model files (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    methods = args.method or METHODS
+    path = os.path.abspath(args.data)
+    with ProcessPoolExecutor(max_workers=len(methods)) as executor:
+        jobs = [executor.submit(train, path, method, args.chunksize, args.output) for method in methods]
+        for method, job in zip(methods, jobs):
+            print(f"{method}: {job.result()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Timing spans, cache counters and memory sampling for app reruns.
+
+Profiling is off unless ``AIR_QUALITY_PROFILE`` is set to a non-empty value
+other than ``0``; when off, :func:`span` does nothing. When on, each rerun
+of app.py is bracketed by :func:`start_run` and :func:`finish_run`, which
+record how long every stage took. Results are exported to:
+
+- ``AIR_QUALITY_PROFILE_LOG``: a JSON-lines file with one record per rerun.
+- ``AIR_QUALITY_PROFILE_METRICS``: a Prometheus text-format file with
+  cumulative stage timings, cache hits and misses and peak memory,
+  rewritten after every rerun.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ENABLED = os.environ.get("AIR_QUALITY_PROFILE", "") not in ("", "0")
+LOG_PATH = os.environ.get("AIR_QUALITY_PROFILE_LOG")
+METRICS_PATH = os.environ.get("AIR_QUALITY_PROFILE_METRICS")
+
+_lock = threading.Lock()
+_write_lock = threading.Lock()
+_local = threading.local()
+_totals = {}
+_runs = {"count": 0, "seconds": 0.0}
+
+
+def peak_memory():
+    """Peak resident memory of the process in bytes, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def start_run():
+    """Begin recording the spans of one rerun on this thread."""
+    if ENABLED:
+        _local.spans = []
+        _local.start = time.perf_counter()
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as the stage ``name`` of the current rerun."""
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        spans = getattr(_local, "spans", None)
+        if spans is not None:
+            spans.append((name, elapsed))
+        with _lock:
+            count, total, longest = _totals.get(name, (0, 0.0, 0.0))
+            _totals[name] = (count + 1, total + elapsed, max(longest, elapsed))
+
+
+def cache_counters():
+    """Hits and misses of the package's caches, as {cache: (hits, misses)}."""
+    from air_quality import data, forecast, health, sources, yearly
+
+    counters = {}
+    for name, cached in [
+        ("dataset", data._load_dataset),
+        ("index", yearly._load_index),
+        ("trends", forecast._load_trends),
+        ("source", sources._load_source),
+        ("city_aqi", sources._city_aqi),
+        ("image", health.image_bytes),
+    ]:
+        info = cached.cache_info()
+        counters[name] = (info.hits, info.misses)
+
+    # Only report chart caches when charts are in use, to avoid importing plotly.
+    charts = sys.modules.get("air_quality.charts")
+    if charts is not None:
+        for name, cache in [("figure", charts.FIGURES), ("figure_table", charts.TABLES)]:
+            counters[name] = (cache.stats["hits"], cache.stats["misses"])
+    return counters
+
+
+def finish_run(**labels):
+    """Finish the current rerun and write the configured exports.
+
+    ``labels`` (for example the selected pollutant and city) are added to
+    the JSON log record. Returns the record, or None when profiling is off.
+    """
+    if not ENABLED or getattr(_local, "spans", None) is None:
+        return None
+
+    spans, _local.spans = _local.spans, None
+    elapsed = time.perf_counter() - _local.start
+    with _lock:
+        _runs["count"] += 1
+        _runs["seconds"] += elapsed
+
+    stages = {}
+    for name, seconds in spans:
+        stages[name] = stages.get(name, 0.0) + seconds
+
+    record = {
+        "time": time.time(),
+        "seconds": elapsed,
+        "spans": stages,
+        "caches": cache_counters(),
+        "peak_memory_bytes": peak_memory(),
+        **labels,
+    }
+    if LOG_PATH:
+        with _lock, open(LOG_PATH, "a", encoding="utf-8") as log:
+            log.write(json.dumps(record, default=str) + "\n")
+    if METRICS_PATH:
+        with _write_lock:
+            write_metrics(METRICS_PATH, record["caches"], record["peak_memory_bytes"])
+    return record
+
+
+def metrics_text(caches, peak):
+    """Cumulative metrics in the Prometheus text exposition format."""
+    lines = [
+        "# HELP air_quality_reruns_total App reruns recorded.",
+        "# TYPE air_quality_reruns_total counter",
+        f"air_quality_reruns_total {_runs['count']}",
+        "# HELP air_quality_rerun_seconds_total Time spent in app reruns.",
+        "# TYPE air_quality_rerun_seconds_total counter",
+        f"air_quality_rerun_seconds_total {_runs['seconds']:.6f}",
+        "# HELP air_quality_stage_seconds Time spent in each stage of a rerun.",
+        "# TYPE air_quality_stage_seconds summary",
+    ]
+    with _lock:
+        totals = dict(_totals)
+    for name, (count, total, longest) in sorted(totals.items()):
+        lines.append(f'air_quality_stage_seconds_count{{stage="{name}"}} {count}')
+        lines.append(f'air_quality_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+    lines += [
+        "# HELP air_quality_stage_seconds_max Longest single run of each stage.",
+        "# TYPE air_quality_stage_seconds_max gauge",
+    ]
+    for name, (count, total, longest) in sorted(totals.items()):
+        lines.append(f'air_quality_stage_seconds_max{{stage="{name}"}} {longest:.6f}')
+    lines += [
+        "# HELP air_quality_cache_hits_total Cache lookups answered from the cache.",
+        "# TYPE air_quality_cache_hits_total counter",
+    ]
+    lines += [f'air_quality_cache_hits_total{{cache="{name}"}} {hits}' for name, (hits, _) in caches.items()]
+    lines += [
+        "# HELP air_quality_cache_misses_total Cache lookups that had to build the value.",
+        "# TYPE air_quality_cache_misses_total counter",
+    ]
+    lines += [f'air_quality_cache_misses_total{{cache="{name}"}} {misses}' for name, (_, misses) in caches.items()]
+    if peak is not None:
+        lines += [
+            "# HELP air_quality_peak_memory_bytes Peak resident memory of the process.",
+            "# TYPE air_quality_peak_memory_bytes gauge",
+            f"air_quality_peak_memory_bytes {peak}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path, caches, peak):
+    # Write to a temporary file first so scrapers never see a partial file.
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as metrics:
+        metrics.write(metrics_text(caches, peak))
+    os.replace(temporary, path)
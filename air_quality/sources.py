@@ -0,0 +1,227 @@
+"""Registry of the datasets shipped in ``data/``.
+
+Every source is normalized to the WHO column names (``City or Locality``,
+``WHO Country Name``, ``Measurement Year`` and the pollutant columns) where it
+has them. Sources load lazily: nothing is read until :func:`load_source` asks
+for it. The result is cached per process and, when pyarrow is available,
+converted to a Parquet file next to the source so later processes skip
+parsing spreadsheets and CSVs.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from air_quality.data import (
+    CHUNKSIZE,
+    CITY,
+    COUNTRY,
+    DATA_DIR,
+    DATA_PATH,
+    PM10,
+    PM25,
+    YEAR,
+    file_key,
+    load_dataset,
+    read_parquet_cache,
+    write_parquet_cache,
+)
+
+AQI = "Air Quality Index"
+HEALTH_IMPACT = "Health Impact"
+
+# quality.csv names some countries differently from the WHO database.
+COUNTRY_ALIASES = {
+    "Bosnia Herzegovina": "Bosnia and Herzegovina",
+    "Czech Republic": "Czechia",
+    "Hong Kong SAR": "China",
+    "Iran": "Iran (Islamic Republic of)",
+    "Russia": "Russian Federation",
+    "South Korea": "Republic of Korea",
+    "USA": "United States of America",
+    "Vietnam": "Viet Nam",
+}
+
+
+class Source:
+    def __init__(self, name, path, read, description, cache=True):
+        self.name = name
+        self.path = path
+        self.read = read
+        self.description = description
+        self.cache = cache
+
+    @property
+    def cache_path(self):
+        return os.path.join(os.path.dirname(self.path), f"{self.name}.parquet")
+
+
+SOURCES = {}
+
+# Cached frames and indexes across all sources. Roomy enough for every
+# registered source to stay cached, small enough that frames for files that
+# have since changed are evicted rather than kept for the life of the process.
+CACHE_SIZE = 8
+
+
+def register(name, filename, description, cache=True):
+    """Register the decorated reader as the source ``name`` for ``data/filename``.
+
+    ``filename`` may also be an absolute path. Pass ``cache=False`` for
+    readers that manage their own columnar cache.
+    """
+    def decorator(read):
+        SOURCES[name] = Source(name, os.path.join(DATA_DIR, filename), read, description, cache)
+        return read
+    return decorator
+
+
+def load_source(name):
+    """Return the normalized DataFrame for a registered source.
+
+    The frame is shared between callers and must not be modified in place.
+    """
+    source = SOURCES[name]
+    return _load_source(name, file_key(source.path))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _load_source(name, key):
+    source = SOURCES[name]
+    if not source.cache:
+        return source.read(source.path)
+
+    df = read_parquet_cache(source.cache_path, key)
+    if df is None:
+        df = source.read(source.path)
+        write_parquet_cache(source.cache_path, key, df)
+    return df
+
+
+@register("who", os.path.abspath(DATA_PATH), "WHO Global Air Quality Database, one row per city and year", cache=False)
+def read_who(path):
+    return load_dataset(path, sidecar=True)
+
+
+@register("who_cities", os.path.abspath(DATA_PATH), "Distinct (city, country) pairs in the WHO database")
+def read_who_cities(path):
+    # Only two columns are read, in chunks when AIR_QUALITY_CHUNKSIZE is set,
+    # so this stays cheap for releases too large to load whole.
+    columns = [CITY, COUNTRY]
+    if CHUNKSIZE:
+        chunks = pd.read_csv(path, usecols=columns, dtype=str, chunksize=CHUNKSIZE)
+        df = pd.concat(chunk.drop_duplicates() for chunk in chunks)
+    else:
+        df = pd.read_csv(path, usecols=columns, dtype=str)
+    return df.drop_duplicates().astype(str).reset_index(drop=True)
+
+
+def normalize_aqi(df):
+    place = df[CITY].str.rsplit(", ", n=1, expand=True)
+    return pd.DataFrame({
+        CITY: place[0],
+        COUNTRY: place[1].replace(COUNTRY_ALIASES),
+        AQI: df[AQI].astype("int16"),
+        HEALTH_IMPACT: df[HEALTH_IMPACT].astype("category"),
+    })
+
+
+@register("aqi", "quality.csv", "Air Quality Index and health impact label by city")
+def read_quality(path):
+    return normalize_aqi(pd.read_csv(path))
+
+
+@register("aqi_raw", "air.csv", "Headerless copy of quality.csv")
+def read_air(path):
+    return normalize_aqi(pd.read_csv(path, header=None, names=[CITY, AQI, HEALTH_IMPACT]))
+
+
+@register("emissions", "airquality.csv", "Emissions by pollutant, percentage change from the 1990 level")
+def read_emissions(path):
+    df = pd.read_csv(path)
+    df.columns = [column.split("\n")[0] for column in df.columns]
+    return df.rename(columns={"Year": YEAR}).astype({YEAR: "int16"})
+
+
+def read_oap(path, sheet, pollutant):
+    df = pd.read_excel(path, sheet_name=sheet, header=None, skiprows=3, usecols=range(5))
+    df.columns = ["Region", COUNTRY, CITY, pollutant, YEAR]
+    df = df.dropna(subset=[CITY, pollutant])
+    # A few rows report a span such as "2003-2004"; keep the final year.
+    df[YEAR] = df[YEAR].astype(str).str[-4:].astype("int16")
+    df[pollutant] = df[pollutant].astype("float32")
+    return df.reset_index(drop=True)
+
+
+@register("oap_pm25", "oap_database-(1).xls", "Older WHO outdoor air pollution database, PM2.5 by city")
+def read_oap_pm25(path):
+    return read_oap(path, "PM2.5 (cities)", PM25)
+
+
+@register("oap_pm10", "oap_database-(1).xls", "Older WHO outdoor air pollution database, PM10 by city")
+def read_oap_pm10(path):
+    return read_oap(path, "PM10 (cities)", PM10)
+
+
+class HashIndex:
+    """Hash index from key columns to row positions in a source frame.
+
+    Keys are compared case-insensitively. When a key occurs more than once,
+    the first row wins.
+    """
+
+    def __init__(self, frame, on):
+        self.frame = frame
+        self.on = list(on)
+        self.positions = {}
+        for position, key in enumerate(self._keys(frame)):
+            self.positions.setdefault(key, position)
+
+    def _keys(self, frame):
+        columns = [frame[column].astype(str).str.casefold() for column in self.on]
+        return zip(*columns)
+
+    def lookup(self, frame):
+        """Row positions matching each row of ``frame``, or -1 when missing."""
+        return np.fromiter((self.positions.get(key, -1) for key in self._keys(frame)), dtype=np.intp, count=len(frame))
+
+    def join(self, frame, columns):
+        """Return ``frame`` with ``columns`` attached from the indexed source."""
+        positions = self.lookup(frame)
+        found = positions >= 0
+        result = frame.reset_index(drop=True).copy()
+        for column in columns:
+            values = self.frame[column].to_numpy(dtype=object)[np.where(found, positions, 0)]
+            result[column] = pd.Series(np.where(found, values, None), dtype=object)
+        return result
+
+
+def source_index(name, *on):
+    """Return a :class:`HashIndex` on the ``on`` columns of a source.
+
+    Indexes are cached per process and rebuilt when the source file changes.
+    """
+    return _source_index(name, file_key(SOURCES[name].path), on)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _source_index(name, key, on):
+    return HashIndex(load_source(name), on)
+
+
+def city_aqi():
+    """AQI and health impact for the WHO cities listed in quality.csv.
+
+    Returns a DataFrame indexed by city with ``Air Quality Index`` and
+    ``Health Impact`` columns.
+    """
+    return _city_aqi(file_key(SOURCES["who_cities"].path), file_key(SOURCES["aqi"].path))
+
+
+@lru_cache(maxsize=2)
+def _city_aqi(who_key, aqi_key):
+    cities = load_source("who_cities")
+    joined = source_index("aqi", CITY, COUNTRY).join(cities, [AQI, HEALTH_IMPACT])
+    joined = joined.dropna(subset=[AQI]).drop_duplicates(subset=[CITY])
+    return joined.set_index(CITY)[[AQI, HEALTH_IMPACT]]
@@ -0,0 +1,33 @@
+"""Streamlit rendering for the app's views.
+
+Kept apart from the rest of the package so the data and forecasting modules
+can be used without importing streamlit.
+"""
+import streamlit as st
+
+from air_quality.health import IMAGE_WIDTH, image_bytes, sections, summary
+
+
+def render_health(pollutant, band, city):
+    """Render the health-impact summary and expanders for a predicted band.
+
+    Expanders track their open state, so their text and images are only
+    sent once the user opens them.
+    """
+    for paragraph in summary(pollutant, band, city):
+        st.write(paragraph)
+
+    for i, (title, paragraphs, figure) in enumerate(sections(pollutant, band)):
+        expander = st.expander(title, key=f"health-{pollutant}-{i}", on_change="rerun")
+        with expander:
+            if not expander.open:
+                continue
+            for paragraph in paragraphs:
+                st.write(paragraph)
+            if figure is not None:
+                image, caption, text = figure
+                col1, col2 = st.columns([1, 1])
+                with col1:
+                    st.image(image_bytes(image), caption=caption, width=IMAGE_WIDTH)
+                with col2:
+                    st.write(text)
@@ -0,0 +1,127 @@
+"""Precomputed yearly means and city eligibility for every pollutant.
+
+One groupby over (city, database version) produces the yearly means for all
+pollutants at once. Cities are eligible for a pollutant when they have at
+least two years with data, which is what the regression needs. Lookups by
+city go through precomputed positions instead of masking the full frame.
+"""
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from air_quality.data import CHUNKSIZE, CITY, DATA_PATH, DTYPES, POLLUTANTS, VERSION, file_key, load_dataset
+
+MIN_YEARS = 2
+
+
+class YearlyIndex:
+    """Yearly pollutant means per city, with O(1) per-city lookups.
+
+    ``sums`` and ``counts`` are indexed by (city, year) and have one column
+    per pollutant. ``order`` lists cities in the order they first appear in
+    the source data. ``rows`` optionally maps each city to its row positions
+    in ``frame``. ``version`` identifies the data the index was built from;
+    :func:`load_index` sets it to the file path, mtime and size.
+    """
+
+    def __init__(self, sums, counts, order, frame=None, rows=None, version=None):
+        self.version = version
+        self.sums = sums
+        self.counts = counts
+        self.frame = frame
+        self.rows = rows or {}
+        self.means = (sums / counts.where(counts > 0)).astype("float64")
+
+        self.slices = {}
+        for city, positions in self.means.groupby(level=0, observed=True, sort=False).indices.items():
+            self.slices[city] = slice(positions[0], positions[-1] + 1)
+
+        years = self.means.notna().groupby(level=0, observed=True).sum().reindex(order)
+        self.eligible = {
+            pollutant: years.index[years[pollutant] >= MIN_YEARS].tolist()
+            for pollutant in self.means.columns
+        }
+
+    @classmethod
+    def from_frame(cls, df, year_column=VERSION):
+        values = df[POLLUTANTS].astype("float64")
+        keys = [df[CITY], df[year_column]]
+        grouped = values.groupby(keys, observed=True, sort=True)
+        rows = df.groupby(CITY, observed=True, sort=False).indices
+        order = df[CITY].drop_duplicates().tolist()
+        return cls(grouped.sum(), grouped.count(), order, frame=df, rows=rows)
+
+    @classmethod
+    def from_csv(cls, path, chunksize, year_column=VERSION):
+        """Build the index by streaming ``path`` in chunks of ``chunksize`` rows.
+
+        Only the city, year and pollutant columns are read, and each chunk is
+        folded into running sums and counts, so memory is bounded by the
+        number of distinct (city, year) pairs rather than the file size. The
+        index keeps no source rows, so :meth:`city_data` is unavailable.
+        """
+        dtypes = {CITY: "str", year_column: DTYPES[year_column]}
+        dtypes.update((pollutant, DTYPES[pollutant]) for pollutant in POLLUTANTS)
+        sums = counts = None
+        order = {}
+
+        for chunk in pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize):
+            order.update(dict.fromkeys(chunk[CITY].unique()))
+            values = chunk[POLLUTANTS].astype("float64")
+            grouped = values.groupby([chunk[CITY], chunk[year_column]], sort=False)
+            if sums is None:
+                sums, counts = grouped.sum(), grouped.count()
+            else:
+                sums = sums.add(grouped.sum(), fill_value=0)
+                counts = counts.add(grouped.count(), fill_value=0)
+
+        if sums is None:
+            raise ValueError(f"{path} has no rows")
+        return cls(sums.sort_index(), counts.sort_index().astype("int64"), list(order))
+
+    def cities(self, pollutant):
+        """Cities with at least two years of data for ``pollutant``."""
+        return self.eligible[pollutant]
+
+    def city_data(self, city):
+        """All source rows for ``city``."""
+        if self.frame is None:
+            raise ValueError("city_data is not available for an index streamed from CSV")
+        return self.frame.iloc[self.rows.get(city, np.array([], dtype=np.intp))]
+
+    def yearly(self, city, pollutant):
+        """Yearly means for one city as a two-column DataFrame.
+
+        Years where the pollutant was not measured are kept as NaN, matching
+        ``city_data.groupby(year)[pollutant].mean().reset_index()``.
+        """
+        year_column = self.means.index.names[1]
+        part = self.means.iloc[self.slices.get(city, slice(0, 0))]
+        return pd.DataFrame({
+            year_column: part.index.get_level_values(1).to_numpy(),
+            pollutant: part[pollutant].to_numpy(),
+        })
+
+
+def load_index(path=DATA_PATH, sidecar=False, chunksize=CHUNKSIZE, year_column=VERSION):
+    """Return the yearly index for the dataset at ``path``.
+
+    Like :func:`air_quality.data.load_dataset`, the index is cached per
+    process and rebuilt only when the file changes. With ``chunksize`` the
+    CSV is streamed instead of loaded whole; see :meth:`YearlyIndex.from_csv`.
+    Years are database versions unless ``year_column`` says otherwise.
+    """
+    path = os.path.abspath(path)
+    return _load_index(path, file_key(path), sidecar, chunksize, year_column)
+
+
+@lru_cache(maxsize=4)
+def _load_index(path, key, sidecar, chunksize, year_column):
+    if chunksize:
+        index = YearlyIndex.from_csv(path, chunksize, year_column)
+    else:
+        index = YearlyIndex.from_frame(load_dataset(path, sidecar=sidecar), year_column)
+    index.version = (path,) + key + (year_column,)
+    return index
@@ -0,0 +1,67 @@
+"""Time figure construction and measure figure sizes.
+
+Compares the px.line figure app.py used to build on every rerun with the
+cached figures from air_quality.charts, and LTTB downsampling of a long
+series. Run from the repository root:
+
+    python benchmarks/bench_charts.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air_quality.charts import FIGURES, city_figure, compare_figure, downsample, figure_bytes  # noqa: E402
+from air_quality.data import PM25  # noqa: E402
+from air_quality.forecast import load_trends  # noqa: E402
+from air_quality.yearly import load_index  # noqa: E402
+
+CITIES = 50
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    index = load_index()
+    trends = load_trends()
+    cities = index.cities(PM25)[:CITIES]
+    px.line(index.yearly(cities[0], PM25), x="Version of the database", y=PM25)
+
+    _, before = timed(lambda: [
+        px.line(index.yearly(city, PM25), x="Version of the database", y=PM25, title=f"{PM25} Levels in {city}")
+        for city in cities
+    ])
+    forecasts = {city: trends.forecast(city, PM25, 5) for city in cities}
+    _, cold = timed(lambda: [city_figure(index, city, PM25, forecasts[city], trends) for city in cities])
+    _, warm = timed(lambda: [city_figure(index, city, PM25, forecasts[city], trends) for city in cities])
+
+    old_size = figure_bytes(px.line(index.yearly(cities[0], PM25), x="Version of the database", y=PM25))
+    new_size = figure_bytes(city_figure(index, cities[0], PM25, forecasts[cities[0]], trends))
+
+    compared, compare_time = timed(lambda: compare_figure(index, cities[:10], PM25))
+
+    x = np.arange(200_000)
+    series = pd.DataFrame({"x": x, "y": np.sin(x / 1000) + np.random.default_rng(0).normal(0, 0.1, len(x))})
+    full = px.line(series, x="x", y="y")
+    reduced, lttb_time = timed(lambda: downsample(series, "x", "y"))
+
+    print(f"px.line per rerun:              {before / CITIES:7.2f} ms, {old_size / 1000:6.1f} KB")
+    print(f"city_figure first build:        {cold / CITIES:7.2f} ms, {new_size / 1000:6.1f} KB (with forecast)")
+    print(f"city_figure cached + overlay:   {warm / CITIES:7.4f} ms")
+    print(f"compare_figure, 10 cities:      {compare_time:7.2f} ms, {figure_bytes(compared) / 1000:6.1f} KB")
+    print(f"200k-point series, full:        {figure_bytes(full) / 1e6:7.2f} MB")
+    print(f"200k-point series, LTTB to {len(reduced)}: {lttb_time:7.2f} ms")
+    print(f"cache stats: {FIGURES.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Check the batch trend fits against scikit-learn and time both.
+
+TrendTable is checked against LinearRegression on database versions, and
+the ols and ridge ModelTables against LinearRegression and Ridge on
+measurement years.
+
+Run from the repository root:
+
+    python benchmarks/bench_forecast.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from sklearn.linear_model import LinearRegression, Ridge
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air_quality.data import POLLUTANTS, VERSION, YEAR  # noqa: E402
+from air_quality.forecast import TrendTable  # noqa: E402
+from air_quality.models import RIDGE_ALPHA, ModelTable  # noqa: E402
+from air_quality.yearly import load_index  # noqa: E402
+
+TARGET_YEAR = 2030
+
+
+def main():
+    index = load_index()
+
+    start = time.perf_counter()
+    trends = TrendTable.from_means(index.means)
+    batch = time.perf_counter() - start
+
+    series = 0
+    start = time.perf_counter()
+    for pollutant in POLLUTANTS:
+        for city in index.cities(pollutant):
+            yearly = index.yearly(city, pollutant).dropna(subset=[pollutant])
+            model = LinearRegression()
+            model.fit(yearly[VERSION].values.reshape(-1, 1), yearly[pollutant].values)
+            expected = model.predict([[TARGET_YEAR]])[0]
+            actual = trends.predict(city, pollutant, TARGET_YEAR)
+            assert np.isclose(actual, expected, rtol=1e-6, atol=1e-6), (city, pollutant, actual, expected)
+            series += 1
+    sklearn = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for pollutant in POLLUTANTS:
+        trends.forecast_all(pollutant, TARGET_YEAR)
+    bulk = time.perf_counter() - start
+
+    print(f"series checked against LinearRegression: {series}")
+    print(f"TrendTable fit, all cities:     {batch * 1000:8.2f} ms")
+    print(f"LinearRegression, one by one:   {sklearn * 1000:8.2f} ms (including predict)")
+    print(f"forecast_all, all pollutants:   {bulk * 1000:8.2f} ms")
+
+    years = load_index(year_column=YEAR)
+    for method, estimator in [("ols", LinearRegression), ("ridge", lambda: Ridge(alpha=RIDGE_ALPHA))]:
+        start = time.perf_counter()
+        table = ModelTable.fit(years.means, method)
+        fit = time.perf_counter() - start
+
+        series = 0
+        for pollutant in POLLUTANTS:
+            for city in years.cities(pollutant):
+                yearly = years.yearly(city, pollutant).dropna(subset=[pollutant])
+                model = estimator().fit(yearly[YEAR].values.reshape(-1, 1), yearly[pollutant].values)
+                # ModelTable clips forecasts at zero.
+                expected = max(model.predict([[TARGET_YEAR]])[0], 0.0)
+                actual, _, _ = table.predict(city, pollutant, TARGET_YEAR)
+                assert np.isclose(actual, expected, rtol=1e-6, atol=1e-6), (method, city, pollutant, actual, expected)
+                series += 1
+        print(f"ModelTable {method:5} fit, all cities: {fit * 1000:8.2f} ms ({series} series match scikit-learn)")
+
+
+if __name__ == "__main__":
+    main()
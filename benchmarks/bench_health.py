@@ -0,0 +1,123 @@
+"""Measure per-rerun payload and server time of the health-impact section.
+
+"eager" renders every section with the original images read from disk, as
+app.py used to. "lazy" is air_quality.views.render_health, with every
+expander closed (the common case) and with every expander open. Run from the
+repository root:
+
+    python benchmarks/bench_health.py
+"""
+import os
+import sys
+import time
+
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from air_quality.health import BANDS, sections  # noqa: E402
+
+RERUNS = 10
+
+EAGER = """
+import os
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+from air_quality import content
+from air_quality.data import DATA_DIR
+from air_quality.health import sections, summary
+
+for paragraph in summary({pollutant!r}, {band!r}, "Testville"):
+    st.write(paragraph)
+for title, paragraphs, figure in sections({pollutant!r}, {band!r}):
+    with st.expander(title):
+        for paragraph in paragraphs:
+            st.write(paragraph)
+        if figure is not None:
+            image, caption, text = figure
+            col1, col2 = st.columns([1, 1])
+            with col1:
+                st.image(os.path.join(DATA_DIR, content.IMAGES[image]), caption=caption, width=300)
+            with col2:
+                st.write(text)
+"""
+
+LAZY = """
+import sys
+sys.path.insert(0, {root!r})
+from air_quality.views import render_health
+
+render_health({pollutant!r}, {band!r}, "Testville")
+"""
+
+media_bytes = 0
+_add = MediaFileManager.add
+
+
+def counting_add(self, path_or_data, *args, **kwargs):
+    global media_bytes
+    media_bytes += os.path.getsize(path_or_data) if isinstance(path_or_data, str) else len(path_or_data)
+    return _add(self, path_or_data, *args, **kwargs)
+
+
+MediaFileManager.add = counting_add
+
+
+def walk(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from walk(child)
+
+
+def measure(at):
+    """Return (element bytes, image bytes, text, ms) for reruns of ``at``.
+
+    Element bytes and time are averaged over RERUNS reruns. Image bytes are
+    those registered with the media file manager on the first run, since
+    streamlit reuses the media file for identical images afterwards.
+    """
+    global media_bytes
+    media_bytes = 0
+    at.run()
+    images = media_bytes
+    start = time.perf_counter()
+    for _ in range(RERUNS):
+        at.run()
+    elapsed = (time.perf_counter() - start) / RERUNS * 1000
+    nodes = list(walk(at._tree))
+    payload = sum(node.proto.ByteSize() for node in nodes if getattr(node, "proto", None) is not None)
+    text = [node.value for node in nodes if type(node).__name__ == "Markdown"]
+    return payload, images, text, elapsed
+
+
+def row(payload, images, elapsed):
+    return f"{payload / 1000:5.1f} KB {images / 1000:6.1f} KB {elapsed:5.1f} ms"
+
+
+def main():
+    header = "elements  images    rerun"
+    print(f"{'pollutant':15} {'band':10} | eager: {header} | lazy, closed: {header} | lazy, open: {header}")
+    for pollutant, bands in BANDS.items():
+        for band, *_ in bands:
+            values = {"root": ROOT, "pollutant": pollutant, "band": band}
+            eager, eager_images, eager_text, eager_time = measure(AppTest.from_string(EAGER.format(**values)))
+
+            at = AppTest.from_string(LAZY.format(**values))
+            closed, closed_images, _, closed_time = measure(at)
+            for i in range(len(sections(pollutant, band))):
+                at.session_state[f"health-{pollutant}-{i}"] = True
+            opened, opened_images, opened_text, opened_time = measure(at)
+
+            assert opened_text == eager_text, (pollutant, band)
+            print(
+                f"{pollutant:15} {band:10} | eager: {row(eager, eager_images, eager_time)} "
+                f"| lazy, closed: {row(closed, closed_images, closed_time)} "
+                f"| lazy, open: {row(opened, opened_images, opened_time)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Compare rerun latency and memory of the old and new dataset loading.
+
+Run from the repository root:
+
+    python benchmarks/bench_loader.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air_quality.data import DATA_PATH, _load_dataset, load_dataset, sidecar_path  # noqa: E402
+
+RERUNS = 20
+
+
+def timed(fn, runs=RERUNS):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+    df = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df.memory_usage(deep=True).sum() / 1e6, peak / 1e6
+
+
+def main():
+    before = timed(lambda: pd.read_csv(DATA_PATH))
+
+    _load_dataset.cache_clear()
+    if os.path.exists(sidecar_path(DATA_PATH)):
+        os.remove(sidecar_path(DATA_PATH))
+    cold = timed(lambda: load_dataset(), runs=1)
+    warm = timed(lambda: load_dataset())
+
+    load_dataset(sidecar=True)
+    _load_dataset.cache_clear()
+    cold_sidecar = timed(lambda: load_dataset(sidecar=True), runs=1)
+
+    _load_dataset.cache_clear()
+    old_frame, old_peak = peak_memory(lambda: pd.read_csv(DATA_PATH))
+    new_frame, new_peak = peak_memory(lambda: load_dataset())
+
+    print(f"read_csv per rerun (before):   {before:8.2f} ms")
+    print(f"load_dataset cold:             {cold:8.2f} ms")
+    print(f"load_dataset cold via sidecar: {cold_sidecar:8.2f} ms")
+    print(f"load_dataset per rerun:        {warm:8.4f} ms")
+    print(f"frame size  before/after:      {old_frame:.1f} MB / {new_frame:.1f} MB")
+    print(f"peak alloc  before/after:      {old_peak:.1f} MB / {new_peak:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
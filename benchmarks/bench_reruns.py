@@ -0,0 +1,136 @@
+"""Replay scripted widget interactions against app.py and report rerun latency.
+
+The app runs headlessly through Streamlit's AppTest with profiling enabled,
+so each rerun is broken down by stage. Models are trained into a temporary
+directory before the timed reruns start. Pass ``--max-ms`` to fail (exit 1)
+when the 95th percentile rerun latency exceeds a budget, for use before
+deploying. Run from the repository root:
+
+    python benchmarks/bench_reruns.py [--rounds 3] [--max-ms 250]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOG = os.path.join(tempfile.mkdtemp(), "profile.jsonl")
+
+# Profiling and models read their settings at import, which happens inside AppTest.
+os.environ["AIR_QUALITY_PROFILE"] = "1"
+os.environ["AIR_QUALITY_PROFILE_LOG"] = LOG
+os.environ["AIR_QUALITY_MODELS"] = tempfile.mkdtemp()
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+LINEAR = "Linear trend (database versions)"
+MODELS = ["Measurement-year trend", "Robust trend (Huber)", "Regularized trend (ridge)"]
+
+# (widget, value): pollutant, city and model are selectbox values (cities by
+# position in the eligible list), years is the slider, compare adds the
+# next N eligible cities to the comparison chart.
+SCRIPT = [
+    ("pollutant", "PM2.5 (μg/m3)"),
+    ("city", 3),
+    ("years", 10),
+    ("years", 24),
+    ("compare", 3),
+    ("model", MODELS[0]),
+    ("years", 15),
+    ("pollutant", "NO2 (μg/m3)"),
+    ("city", 20),
+    ("model", MODELS[1]),
+    ("years", 5),
+    ("model", MODELS[2]),
+    ("pollutant", "PM10 (μg/m3)"),
+    ("city", 0),
+    ("model", LINEAR),
+    ("years", 0),
+    ("compare", 0),
+]
+
+
+def interact(at, widget, value):
+    if widget == "pollutant":
+        at.selectbox[0].select(value)
+    elif widget == "city":
+        at.selectbox[1].select(at.selectbox[1].options[value])
+    elif widget == "model":
+        at.selectbox[2].select(value)
+    elif widget == "years":
+        at.slider[0].set_value(value)
+    elif widget == "compare":
+        current = at.selectbox[1].value
+        others = [city for city in at.multiselect[0].options if city != current]
+        at.multiselect[0].set_value(others[:value])
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{widget}={value!r} raised: {at.exception[0].message}")
+
+
+def train_models(at):
+    """Select each model once and rerun until the app has finished training it."""
+    for model in MODELS:
+        interact(at, "model", model)
+        while any("still training" in info.value for info in at.info):
+            time.sleep(0.1)
+            at.run()
+    interact(at, "model", LINEAR)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3, help="times to replay the script (default: %(default)s)")
+    parser.add_argument("--max-ms", type=float, help="fail if the p95 rerun latency exceeds this")
+    args = parser.parse_args(argv)
+
+    os.chdir(ROOT)
+    at = AppTest.from_file(os.path.join(ROOT, "app.py"), default_timeout=120)
+
+    start = time.perf_counter()
+    at.run()
+    print(f"first run (cold caches): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    train_models(at)
+    print(f"model training: {(time.perf_counter() - start) * 1000:.1f} ms")
+    # Skip the records of the untimed runs so far.
+    with open(LOG, encoding="utf-8") as log:
+        skip = sum(1 for _ in log)
+
+    latencies = []
+    for _ in range(args.rounds):
+        for widget, value in SCRIPT:
+            start = time.perf_counter()
+            interact(at, widget, value)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    with open(LOG, encoding="utf-8") as log:
+        records = [json.loads(line) for line in log][skip:]
+    stages = {}
+    for record in records:
+        for name, seconds in record["spans"].items():
+            stages.setdefault(name, []).append(seconds * 1000)
+
+    p50, p95 = percentile(latencies, 0.5), percentile(latencies, 0.95)
+    print(f"{len(latencies)} scripted reruns: p50 {p50:.1f} ms, p95 {p95:.1f} ms, max {max(latencies):.1f} ms")
+    for name, values in sorted(stages.items(), key=lambda item: -sum(item[1])):
+        print(f"  {name:12} mean {sum(values) / len(values):7.2f} ms, max {max(values):7.2f} ms")
+    print(f"caches (hits, misses): {records[-1]['caches']}")
+    print(f"peak memory: {records[-1]['peak_memory_bytes'] / 1e6:.0f} MB")
+
+    if args.max_ms is not None and p95 > args.max_ms:
+        print(f"p95 {p95:.1f} ms exceeds the {args.max_ms:.1f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
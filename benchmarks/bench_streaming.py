@@ -0,0 +1,61 @@
+"""Compare peak memory of whole-file and streamed yearly aggregation.
+
+The bundled CSV is repeated to stand in for a larger WHO release. Run from
+the repository root:
+
+    python benchmarks/bench_streaming.py [copies] [chunksize]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from air_quality.data import DATA_PATH, load_dataset  # noqa: E402
+from air_quality.yearly import YearlyIndex  # noqa: E402
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1e6
+
+
+def main(copies=10, chunksize=20_000):
+    with open(DATA_PATH, encoding="utf-8") as source:
+        header = source.readline()
+        body = source.read()
+    if not body.endswith("\n"):
+        body += "\n"
+
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8", delete=False) as large:
+        large.write(header)
+        for _ in range(copies):
+            large.write(body)
+    size = os.path.getsize(large.name) / 1e6
+
+    try:
+        whole, whole_time, whole_peak = measure(lambda: YearlyIndex.from_frame(load_dataset(large.name)))
+        streamed, streamed_time, streamed_peak = measure(lambda: YearlyIndex.from_csv(large.name, chunksize))
+    finally:
+        os.remove(large.name)
+
+    assert whole.means.index.equals(streamed.means.index)
+    assert np.allclose(whole.means.to_numpy(), streamed.means.to_numpy(), equal_nan=True)
+    assert whole.eligible == streamed.eligible
+
+    print(f"input: {size:.1f} MB ({copies} copies of {os.path.basename(DATA_PATH)})")
+    print(f"whole file: {whole_time:6.2f} s, peak {whole_peak:7.1f} MB")
+    print(f"streamed:   {streamed_time:6.2f} s, peak {streamed_peak:7.1f} MB (chunks of {chunksize} rows)")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from air_quality.data import CITY, NO2, PM25, VERSION
+from air_quality.forecast import TrendTable
+
+
+@pytest.fixture
+def means():
+    rows = [
+        # A steady series, a noisy one and one with a missing year.
+        ("Alpha", 2016, 10.0, 30.0),
+        ("Alpha", 2018, 12.0, 29.0),
+        ("Alpha", 2022, 16.0, 25.0),
+        ("Beta", 2016, 40.0, np.nan),
+        ("Beta", 2017, 31.5, 20.0),
+        ("Beta", 2018, 45.25, np.nan),
+        ("Beta", 2021, 28.0, 18.0),
+        ("Beta", 2022, 33.0, np.nan),
+        # Two points only, and NO2 reported in a single year.
+        ("Gamma", 2018, 8.0, 14.0),
+        ("Gamma", 2022, 6.0, np.nan),
+    ]
+    frame = pd.DataFrame(rows, columns=[CITY, VERSION, PM25, NO2])
+    return frame.set_index([CITY, VERSION])
+
+
+def linear_regression(means, city, pollutant, year):
+    series = means.loc[city, pollutant].dropna()
+    model = LinearRegression().fit(series.index.to_numpy().reshape(-1, 1), series.to_numpy())
+    return model.predict([[year]])[0]
+
+
+@pytest.mark.parametrize("city, pollutant", [
+    ("Alpha", PM25),
+    ("Alpha", NO2),
+    ("Beta", PM25),
+    ("Beta", NO2),
+    ("Gamma", PM25),
+])
+def test_matches_linear_regression(means, city, pollutant):
+    trends = TrendTable.from_means(means)
+    for year in (2016, 2022, 2030):
+        expected = linear_regression(means, city, pollutant, year)
+        assert trends.predict(city, pollutant, year) == pytest.approx(expected, rel=1e-9, abs=1e-9)
+
+
+def test_single_year_is_not_fitted(means):
+    trends = TrendTable.from_means(means)
+    assert np.isnan(trends.predict("Gamma", NO2, 2030))
+    assert trends.last_year[trends.row["Gamma"], trends.column[NO2]] == 2018
+
+
+def test_last_year_skips_missing_values(means):
+    trends = TrendTable.from_means(means)
+    assert trends.last_year[trends.row["Beta"], trends.column[NO2]] == 2021
+    assert trends.points[trends.row["Beta"], trends.column[NO2]] == 2